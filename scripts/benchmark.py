@@ -0,0 +1,773 @@
+# Copyright 2017 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Benchmark designatedlands processing against a synthetic province
+#
+# Run from the root of the repository (the sql folder is loaded from the
+# working directory), for example:
+#
+#   $ python scripts/benchmark.py pipeline --sources 10 --features 200
+#
+# Stage timings and throughput are written to a JSON file, supply a previous
+# result with --baseline to compare.
+#
+# The raster overlay can be benchmarked on its own, without a database:
+#
+#   $ python scripts/benchmark.py raster --width 20000 --height 20000
+
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import click
+from cligj import verbose_opt, quiet_opt
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import designatedlands  # noqa: E402
+from designatedlands import DesignatedLands, set_log_level  # noqa: E402
+
+LOG = logging.getLogger(__name__)
+
+# synthetic province origin (BC Albers), within the bounds of the output rasters
+ORIGIN = (600000, 600000)
+
+RESTRICTIONS = ["FULL", "HIGH", "MEDIUM", "LOW", "NONE"]
+
+
+@contextmanager
+def timed(results, stage, **counts):
+    """Record duration of the stage (and throughput of any supplied counts)
+    """
+    LOG.info(f"Benchmarking {stage}")
+    start = time.perf_counter()
+    yield
+    seconds = time.perf_counter() - start
+    results[stage] = {"seconds": round(seconds, 3)}
+    for name, count in counts.items():
+        results[stage][name] = count
+        results[stage][f"{name}_per_s"] = round(count / seconds, 3) if seconds else None
+    LOG.info(f"{stage}: {seconds:.1f}s")
+
+
+def generate_province(
+    db, sheets_x, sheets_y, sheet_size, n_sources, n_features, coverage, vertices, seed
+):
+    """
+    Create synthetic tiles_250k, tiles_20k and boundary layers, plus
+    n_sources designation source tables of n_features circular polygons
+    (each with approximately `vertices` vertices) covering approximately
+    `coverage` (fraction) of the province. Returns list of source table names
+    """
+    x0, y0 = ORIGIN
+    width, height = sheets_x * sheet_size, sheets_y * sheet_size
+    db.execute("CREATE SCHEMA IF NOT EXISTS designatedlands")
+    db.execute("SELECT setseed(%s)", (seed,))
+
+    # 250k sheets (named like NTS sheets, eg 092B), each split 10x10 into 20k tiles
+    for table in ["tiles_250k", "tiles_20k"]:
+        db.execute(
+            f"""DROP TABLE IF EXISTS designatedlands.{table};
+                CREATE TABLE designatedlands.{table} (map_tile text, geom geometry);"""
+        )
+    db.execute(
+        """
+        INSERT INTO designatedlands.tiles_250k (map_tile, geom)
+        SELECT
+          lpad((82 + i)::text, 3, '0') || chr(65 + j),
+          ST_MakeEnvelope(
+            %(x0)s + i * %(size)s, %(y0)s + j * %(size)s,
+            %(x0)s + (i + 1) * %(size)s, %(y0)s + (j + 1) * %(size)s, 3005)
+        FROM generate_series(0, %(nx)s - 1) i, generate_series(0, %(ny)s - 1) j
+        """,
+        {"x0": x0, "y0": y0, "size": sheet_size, "nx": sheets_x, "ny": sheets_y},
+    )
+    db.execute(
+        """
+        INSERT INTO designatedlands.tiles_20k (map_tile, geom)
+        SELECT
+          t.map_tile || lpad((j * 10 + i + 1)::text, 3, '0'),
+          ST_MakeEnvelope(
+            ST_XMin(t.geom) + i * %(size)s, ST_YMin(t.geom) + j * %(size)s,
+            ST_XMin(t.geom) + (i + 1) * %(size)s, ST_YMin(t.geom) + (j + 1) * %(size)s,
+            3005)
+        FROM designatedlands.tiles_250k t,
+        generate_series(0, 9) i, generate_series(0, 9) j
+        """,
+        {"size": sheet_size / 10.0},
+    )
+    for table in ["tiles_250k", "tiles_20k"]:
+        db.execute(f"CREATE INDEX ON designatedlands.{table} USING GIST (geom)")
+
+    # boundaries - land is an ellipse within the grid, marine is the rest of the grid
+    center = (x0 + width / 2.0, y0 + height / 2.0)
+    land = f"""ST_Scale(
+                 ST_Buffer(ST_MakePoint(0, 0), 0.45, 64),
+                 {width}, {height}
+               )"""
+    boundaries = {
+        "bc_boundary_land": f"""ST_SetSRID(ST_Translate({land}, {center[0]}, {center[1]}), 3005)""",
+        "bc_abms": f"ST_MakeEnvelope({x0}, {y0}, {x0 + width}, {y0 + height}, 3005)",
+        "marine_ecosections": f"ST_MakeEnvelope({x0}, {y0}, {x0 + width}, {y0 + height}, 3005)",
+    }
+    for table, geom in boundaries.items():
+        db.execute(
+            f"""DROP TABLE IF EXISTS designatedlands.{table};
+                CREATE TABLE designatedlands.{table} AS
+                SELECT 1 AS id, ST_Multi({geom}) AS geom;"""
+        )
+
+    # designations, circles of random size and location
+    radius = (coverage * width * height / (n_features * 3.14159)) ** 0.5
+    quad_segs = max(1, int(vertices / 4))
+    tables = []
+    for i in range(1, n_sources + 1):
+        table = f"designatedlands.src_{str(i).zfill(2)}_synthetic_{str(i).zfill(2)}"
+        db.execute(
+            f"""DROP TABLE IF EXISTS {table};
+                CREATE TABLE {table} AS
+                SELECT
+                  n AS synthetic_id,
+                  'synthetic ' || n AS synthetic_name,
+                  ST_Multi(
+                    ST_Buffer(
+                      ST_SetSRID(
+                        ST_MakePoint(
+                          %(x0)s + random() * %(width)s,
+                          %(y0)s + random() * %(height)s
+                        ), 3005),
+                      %(radius)s * (0.5 + random()),
+                      %(quad_segs)s
+                    )
+                  ) AS geom
+                FROM generate_series(1, %(n)s) n;
+                CREATE INDEX ON {table} USING GIST (geom);""",
+            {
+                "x0": x0,
+                "y0": y0,
+                "width": width,
+                "height": height,
+                "radius": radius,
+                "quad_segs": quad_segs,
+                "n": n_features,
+            },
+        )
+        tables.append(table)
+    return tables
+
+
+def write_sources(path, n_sources, seed):
+    """Write sources_designations csv matching the synthetic source tables
+    """
+    import random
+
+    rand = random.Random(seed)
+    with open("sources_designations.csv") as f:
+        columns = next(csv.reader(f))
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for i in range(1, n_sources + 1):
+            row = {c: "" for c in columns}
+            row.update(
+                {
+                    "hierarchy": i,
+                    "name": f"Synthetic designation {i}",
+                    "designation": f"synthetic_{str(i).zfill(2)}",
+                    "source_id_col": "synthetic_id",
+                    "source_name_col": "synthetic_name",
+                    "forest_restriction": rand.choice(RESTRICTIONS),
+                    "og_restriction": rand.choice(RESTRICTIONS),
+                    "mine_restriction": rand.choice(RESTRICTIONS),
+                }
+            )
+            writer.writerow(row)
+
+
+def write_hierarchy_rasters(
+    path, width, height, resolution, n_hierarchy, coverage, seed, spread=1.0, occupancy=True
+):
+    """
+    Write synthetic rasters <path>/rasters/dl_<n>.tif, as created by
+    DesignatedLands.rasterize(). dl_0 is the province (an ellipse), the others
+    are blobs covering approximately `coverage` (fraction) of a random square
+    region covering `spread` (fraction) of the grid. If occupancy is True, the
+    block occupancy bitmap of each raster is written (from the region extent)
+    """
+    import numpy as np
+    import rasterio
+    from affine import Affine
+
+    Path(path, "rasters").mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(int(abs(seed) * 1000))
+    transform = Affine(resolution, 0, ORIGIN[0], 0, -resolution, ORIGIN[1] + height * resolution)
+    profile = {
+        "driver": "GTiff",
+        "dtype": "uint8",
+        "count": 1,
+        "crs": "EPSG:3005",
+        "nodata": 255,
+        "width": width,
+        "height": height,
+        "transform": transform,
+        "compress": "deflate",
+    }
+    # blobs are cells of a coarse random grid, upsampled
+    blob = max(1, min(width, height) // 100)
+    coarse_shape = (-(-height // blob), -(-width // blob))
+    side = spread ** 0.5
+    for hierarchy in range(0, n_hierarchy + 1):
+        raster = Path(path, "rasters", f"dl_{hierarchy}.tif")
+        if hierarchy:
+            coarse = rng.random(coarse_shape) < coverage
+            # confine the blobs to the region
+            region_height, region_width = int(height * side), int(width * side)
+            row_min = int(rng.integers(0, height - region_height + 1))
+            col_min = int(rng.integers(0, width - region_width + 1))
+            region = np.zeros(coarse_shape, dtype=bool)
+            region[
+                row_min // blob : -(-(row_min + region_height) // blob),
+                col_min // blob : -(-(col_min + region_width) // blob),
+            ] = True
+            coarse &= region
+            blocks = Path(designatedlands.occupancy_path(str(raster)))
+            if occupancy:
+                x_min, y_max = transform * (col_min, row_min)
+                x_max, y_min = transform * (col_min + region_width, row_min + region_height)
+                np.save(
+                    blocks,
+                    designatedlands.block_occupancy(
+                        [(x_min, y_min, x_max, y_max)], transform, (height, width)
+                    ),
+                )
+            elif blocks.exists():
+                blocks.unlink()
+        with rasterio.open(raster, "w", **profile) as dst:
+            for window in designatedlands.row_windows(height, width, 4096):
+                rows = np.arange(window.row_off, window.row_off + window.height)
+                if hierarchy:
+                    covered = coarse[rows // blob][:, np.arange(width) // blob]
+                else:
+                    # ellipse
+                    y = (rows[:, None] - height / 2) / (height * 0.45)
+                    x = (np.arange(width)[None, :] - width / 2) / (width * 0.45)
+                    covered = (x ** 2 + y ** 2) <= 1
+                data = np.where(covered, hierarchy, 255).astype("uint8")
+                dst.write(data, window=window, indexes=1)
+
+
+def io_counters():
+    """Return bytes read/written by this process (Linux only)
+    """
+    try:
+        with open("/proc/self/io") as f:
+            return {k: int(v) for k, v in (line.split(": ") for line in f)}
+    except (OSError, ValueError):
+        return {}
+
+
+def run_overlay(path, width, height, resolution, n_hierarchy, scratch_path, block_rows, queue):
+    """
+    Run DesignatedLands.overlay_rasters() on the synthetic rasters in path,
+    putting duration, peak RSS and io of the process on the queue
+    """
+    os.chdir(path)
+    # the overlay only requires the config, sources and raster grid
+    # - create the instance without connecting to the database
+    DL = DesignatedLands.__new__(DesignatedLands)
+    DL.config = designatedlands.DEFAULT_CONFIG.copy()
+    DL.config.update(
+        {
+            "out_path": "outputs",
+            "scratch_path": scratch_path,
+            "block_rows": block_rows,
+            "resolutions": [resolution],
+        }
+    )
+    DL.restriction_lookup = {"FULL": 4, "HIGH": 3, "MEDIUM": 2, "LOW": 1, "NONE": 0}
+    DL.sources = [
+        {
+            "hierarchy": str(h).zfill(2),
+            "designation": f"synthetic_{str(h).zfill(2)}",
+            "forest_restriction": h % 5,
+            "og_restriction": (h + 1) % 5,
+            "mine_restriction": (h + 2) % 5,
+        }
+        for h in range(1, n_hierarchy + 1)
+    ]
+    DL.bounds = [
+        ORIGIN[0],
+        ORIGIN[1],
+        ORIGIN[0] + width * resolution,
+        ORIGIN[1] + height * resolution,
+    ]
+    DL.set_resolutions([resolution])
+    io_start = io_counters()
+    start = time.perf_counter()
+    DL.overlay_rasters()
+    seconds = time.perf_counter() - start
+    io_end = io_counters()
+    queue.put(
+        {
+            "seconds": round(seconds, 3),
+            # ru_maxrss is in kilobytes on Linux
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "bytes_read": io_end.get("read_bytes", 0) - io_start.get("read_bytes", 0),
+            "bytes_written": io_end.get("write_bytes", 0)
+            - io_start.get("write_bytes", 0),
+        }
+    )
+
+
+def compare(results, baseline, threshold):
+    """Log stage timings relative to baseline, return list of regressed stages
+    """
+    regressions = []
+    for stage, result in results.items():
+        if stage not in baseline or not baseline[stage].get("seconds"):
+            continue
+        ratio = result["seconds"] / baseline[stage]["seconds"]
+        flag = ""
+        if ratio > threshold:
+            flag = " REGRESSION"
+            regressions.append(stage)
+        LOG.info(
+            f"{stage}: {result['seconds']:.1f}s (baseline {baseline[stage]['seconds']:.1f}s, "
+            f"{ratio:.2f}x){flag}"
+        )
+    return regressions
+
+
+def write_config(out_path, db_url, n_sources, seed, resolution, n_processes, precision):
+    """Write sources csv and config file for the synthetic province, return config path
+    """
+    sources_csv = out_path / "sources_designations.csv"
+    write_sources(sources_csv, n_sources, seed)
+    config = designatedlands.DEFAULT_CONFIG.copy()
+    if db_url:
+        config["db_url"] = db_url
+    config.update(
+        {
+            "sources_designations": str(sources_csv),
+            "out_path": str(out_path / "outputs"),
+            "n_processes": n_processes,
+            "resolution": resolution,
+            "precision": precision,
+        }
+    )
+    config_file = out_path / "benchmark.cfg"
+    with open(config_file, "w") as f:
+        f.write("[designatedlands]\n")
+        for key, value in config.items():
+            f.write(f"{key}={value}\n")
+    return str(config_file)
+
+
+def province_options(f):
+    """Add options defining the synthetic province to a command
+    """
+    options = [
+        click.option("--db_url", help="Database to benchmark against (default from config)"),
+        click.option("--sheets_x", type=int, default=3, show_default=True, help="250k sheets (columns)"),
+        click.option("--sheets_y", type=int, default=3, show_default=True, help="250k sheets (rows)"),
+        click.option("--sheet_size", type=float, default=100000, show_default=True, help="250k sheet size (m)"),
+        click.option("--sources", "n_sources", type=int, default=10, show_default=True, help="Designation sources"),
+        click.option("--features", "n_features", type=int, default=200, show_default=True, help="Features per source"),
+        click.option("--coverage", type=float, default=0.3, show_default=True, help="Approximate coverage of each source"),
+        click.option("--vertices", type=int, default=64, show_default=True, help="Vertices per feature"),
+        click.option("--resolution", type=int, default=250, show_default=True, help="Raster resolution (m)"),
+        click.option("--n_processes", type=int, default=-1, help="Number of parallel processes"),
+        click.option("--seed", type=float, default=0.5, show_default=True, help="Random seed (-1 to 1)"),
+    ]
+    for option in reversed(options):
+        f = option(f)
+    return f
+
+
+@click.group()
+def cli():
+    pass
+
+
+@cli.command()
+@click.option("--out_path", default="benchmark", show_default=True, help="Working folder")
+@click.option("--out_file", default="benchmark.json", show_default=True, help="Results JSON")
+@click.option("--baseline", type=click.Path(exists=True), help="Previous results JSON to compare")
+@click.option(
+    "--threshold",
+    type=float,
+    default=1.2,
+    show_default=True,
+    help="Flag stages slower than baseline by this factor",
+)
+@click.option(
+    "--precision",
+    type=float,
+    default=0,
+    show_default=True,
+    help="Overlay precision (grid size, m), 0 for the default overlay",
+)
+@click.option(
+    "--unlogged",
+    is_flag=True,
+    default=False,
+    help="Create the output tables UNLOGGED",
+)
+@province_options
+@verbose_opt
+@quiet_opt
+def pipeline(
+    out_path,
+    out_file,
+    baseline,
+    threshold,
+    precision,
+    unlogged,
+    db_url,
+    sheets_x,
+    sheets_y,
+    sheet_size,
+    n_sources,
+    n_features,
+    coverage,
+    vertices,
+    resolution,
+    n_processes,
+    seed,
+    verbose,
+    quiet,
+):
+    """Benchmark processing stages against a synthetic province"""
+    set_log_level(verbose, quiet)
+    parameters = {k: v for k, v in locals().items() if k not in ("verbose", "quiet")}
+    out_path = Path(out_path)
+    out_path.mkdir(parents=True, exist_ok=True)
+
+    config_file = write_config(
+        out_path, db_url, n_sources, seed, resolution, n_processes, precision
+    )
+    DL = DesignatedLands(config_file)
+    DL.config["unlogged"] = unlogged
+    db = DL.db
+    results = {}
+    with timed(results, "generate"):
+        generate_province(
+            db,
+            sheets_x,
+            sheets_y,
+            sheet_size,
+            n_sources,
+            n_features,
+            coverage,
+            vertices,
+            seed,
+        )
+    db.execute(db.queries["ST_Safe_Repair"])
+    db.execute(db.queries["ST_Safe_Difference"])
+    db.execute(db.queries["ST_Safe_Intersection"])
+
+    n_tiles = sheets_x * sheets_y * 100
+    n_input = n_sources * n_features
+    with timed(results, "clean", features=n_input):
+        DL.clean()
+    with timed(results, "bc_boundary", tiles=n_tiles):
+        DL.create_bc_boundary()
+    with timed(results, "tidy", features=n_input):
+        DL.tidy()
+    n_output = db.query("SELECT count(*) FROM designatedlands.designatedlands").fetchone()[0]
+    with timed(results, "restrictions", tiles=n_tiles, features=n_output):
+        DL.restrictions()
+    with timed(results, "prepare_overlays", features=n_output):
+        DL.prepare_overlays()
+    n_pixels = DL.raster_profile["width"] * DL.raster_profile["height"]
+    with timed(results, "rasterize", pixels=n_pixels * (n_sources + 1)):
+        DL.rasterize()
+    with timed(results, "overlay_rasters", pixels=n_pixels * (n_sources + 1)):
+        DL.overlay_rasters()
+
+    # overlay a set of square areas of interest
+    aoi = "designatedlands.benchmark_aoi"
+    db.execute(
+        f"""DROP TABLE IF EXISTS {aoi};
+            CREATE TABLE {aoi} AS
+            SELECT
+              n AS aoi_id,
+              ST_Buffer(ST_SetSRID(ST_MakePoint(
+                %(x0)s + random() * %(width)s,
+                %(y0)s + random() * %(height)s), 3005), %(size)s, 'endcap=square') AS geom
+            FROM generate_series(1, 50) n;
+            CREATE INDEX ON {aoi} USING GIST (geom);""",
+        {
+            "x0": ORIGIN[0],
+            "y0": ORIGIN[1],
+            "width": sheets_x * sheet_size,
+            "height": sheets_y * sheet_size,
+            "size": sheet_size / 10,
+        },
+    )
+    tiles = DL.get_tiles(aoi, "designatedlands.tiles")
+    with timed(results, "overlay", tiles=len(tiles)):
+        DL.intersect(
+            "designatedlands.designatedlands", aoi, aoi + "_overlay", tiles
+        )
+    with timed(results, "dump", features=n_output):
+        DL.dump()
+
+    report = {"parameters": parameters, "stages": results}
+    with open(out_file, "w") as f:
+        json.dump(report, f, indent=2)
+    LOG.info(f"Results written to {out_file}")
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(results, json.load(f)["stages"], threshold)
+        if regressions:
+            raise click.ClickException(
+                "Stages slower than baseline: " + ", ".join(regressions)
+            )
+
+
+@cli.command()
+@click.option("--out_path", default="benchmark_raster", show_default=True, help="Working folder")
+@click.option("--out_file", default="benchmark_raster.json", show_default=True, help="Results JSON")
+@click.option("--baseline", type=click.Path(exists=True), help="Previous results JSON to compare")
+@click.option(
+    "--threshold",
+    type=float,
+    default=1.2,
+    show_default=True,
+    help="Flag engines slower than baseline by this factor",
+)
+@click.option("--width", type=int, default=10000, show_default=True, help="Raster width (cells)")
+@click.option("--height", type=int, default=10000, show_default=True, help="Raster height (cells)")
+@click.option("--resolution", type=int, default=10, show_default=True, help="Raster resolution (m)")
+@click.option("--hierarchies", "n_hierarchy", type=int, default=10, show_default=True, help="Number of hierarchy rasters")
+@click.option("--coverage", type=float, default=0.3, show_default=True, help="Approximate coverage of each hierarchy")
+@click.option(
+    "--spread",
+    type=float,
+    default=1.0,
+    show_default=True,
+    help="Fraction of the grid (a random square region) holding each hierarchy",
+)
+@click.option(
+    "--occupancy/--no-occupancy",
+    default=True,
+    show_default=True,
+    help="Write block occupancy bitmaps, so the overlay skips empty blocks",
+)
+@click.option(
+    "--engine",
+    "engines",
+    type=click.Choice(["memory", "memmap"]),
+    multiple=True,
+    help="Overlay engine(s) to benchmark (default: all)",
+)
+@click.option("--block_rows", type=int, default=4096, show_default=True, help="Rows per block (memmap engine)")
+@click.option("--seed", type=float, default=0.5, show_default=True, help="Random seed")
+@verbose_opt
+@quiet_opt
+def raster(
+    out_path,
+    out_file,
+    baseline,
+    threshold,
+    width,
+    height,
+    resolution,
+    n_hierarchy,
+    coverage,
+    spread,
+    occupancy,
+    engines,
+    block_rows,
+    seed,
+    verbose,
+    quiet,
+):
+    """Benchmark the raster overlay with synthetic rasters (no database required)"""
+    set_log_level(verbose, quiet)
+    parameters = {k: v for k, v in locals().items() if k not in ("verbose", "quiet")}
+    out_path = Path(out_path).resolve()
+    engines = engines or ["memory", "memmap"]
+    LOG.info(f"Writing {n_hierarchy + 1} synthetic rasters of {width}x{height} cells")
+    write_hierarchy_rasters(
+        out_path, width, height, resolution, n_hierarchy, coverage, seed, spread, occupancy
+    )
+
+    # run each engine in a new process, so peak memory use is measured per engine
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for engine in engines:
+        LOG.info(f"Benchmarking overlay_rasters ({engine})")
+        scratch_path = str(out_path / "scratch") if engine == "memmap" else ""
+        queue = context.Queue()
+        process = context.Process(
+            target=run_overlay,
+            args=(out_path, width, height, resolution, n_hierarchy, scratch_path, block_rows, queue),
+        )
+        process.start()
+        result = queue.get()
+        process.join()
+        n_pixels = width * height * (n_hierarchy + 1)
+        result["pixels"] = n_pixels
+        result["pixels_per_s"] = round(n_pixels / result["seconds"], 3)
+        results[engine] = result
+        LOG.info(
+            f"{engine}: {result['seconds']:.1f}s, {result['pixels_per_s'] / 1e6:.1f} Mpixels/s, "
+            f"peak RSS {result['peak_rss_mb']}MB"
+        )
+
+    report = {"parameters": parameters, "stages": results}
+    with open(out_file, "w") as f:
+        json.dump(report, f, indent=2)
+    LOG.info(f"Results written to {out_file}")
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(results, json.load(f)["stages"], threshold)
+        if regressions:
+            raise click.ClickException(
+                "Engines slower than baseline: " + ", ".join(regressions)
+            )
+
+
+@cli.command()
+@click.option("--out_path", default="benchmark", show_default=True, help="Working folder")
+@click.option("--out_file", default="benchmark_precision.json", show_default=True, help="Results JSON")
+@click.option(
+    "--precision",
+    type=float,
+    default=0.001,
+    show_default=True,
+    help="Overlay precision (grid size, m) to compare to the default overlay",
+)
+@click.option(
+    "--tolerance",
+    type=float,
+    default=0.0001,
+    show_default=True,
+    help="Maximum relative difference in area of each restriction level",
+)
+@province_options
+@verbose_opt
+@quiet_opt
+def precision(
+    out_path,
+    out_file,
+    precision,
+    tolerance,
+    db_url,
+    sheets_x,
+    sheets_y,
+    sheet_size,
+    n_sources,
+    n_features,
+    coverage,
+    vertices,
+    resolution,
+    n_processes,
+    seed,
+    verbose,
+    quiet,
+):
+    """Compare fixed precision overlay to the default overlay (timing and area)"""
+    set_log_level(verbose, quiet)
+    parameters = {k: v for k, v in locals().items() if k not in ("verbose", "quiet")}
+    out_path = Path(out_path)
+    out_path.mkdir(parents=True, exist_ok=True)
+    config_file = write_config(out_path, db_url, n_sources, seed, resolution, n_processes, 0)
+    DL = DesignatedLands(config_file)
+    db = DL.db
+    generate_province(
+        db, sheets_x, sheets_y, sheet_size, n_sources, n_features, coverage, vertices, seed
+    )
+    db.execute(db.queries["ST_Safe_Repair"])
+    db.execute(db.queries["ST_Safe_Difference"])
+    db.execute(db.queries["ST_Safe_Intersection"])
+    DL.clean()
+    DL.create_bc_boundary()
+    DL.tidy()
+
+    n_tiles = sheets_x * sheets_y * 100
+    restrictions = ["forest", "og", "mine"]
+    results = {}
+    with timed(results, "restrictions", tiles=n_tiles):
+        DL.restrictions()
+    # keep the default results for comparison
+    for r in restrictions:
+        db.execute(
+            f"""DROP TABLE IF EXISTS designatedlands.{r}_restriction_reference;
+                CREATE TABLE designatedlands.{r}_restriction_reference AS
+                SELECT * FROM designatedlands.{r}_restriction"""
+        )
+    DL.config["precision"] = precision
+    with timed(results, "restrictions_fixed", tiles=n_tiles):
+        DL.restrictions()
+
+    # compare area of each restriction level
+    failed = []
+    comparison = []
+    for r in restrictions:
+        sql = f"""
+            SELECT
+              coalesce(a.level, b.level) AS level,
+              coalesce(a.area, 0) AS area_reference,
+              coalesce(b.area, 0) AS area_fixed
+            FROM
+              (SELECT {r}_restriction AS level, sum(ST_Area(geom)) AS area
+               FROM designatedlands.{r}_restriction_reference GROUP BY 1) a
+            FULL OUTER JOIN
+              (SELECT {r}_restriction AS level, sum(ST_Area(geom)) AS area
+               FROM designatedlands.{r}_restriction GROUP BY 1) b
+            ON a.level = b.level
+            ORDER BY 1
+        """
+        for level, area_reference, area_fixed in db.query(sql):
+            difference = abs(area_fixed - area_reference) / max(area_reference, 1)
+            comparison.append(
+                {
+                    "restriction": f"{r}_restriction",
+                    "level": level,
+                    "area_reference": area_reference,
+                    "area_fixed": area_fixed,
+                    "relative_difference": difference,
+                }
+            )
+            LOG.info(f"{r}_restriction {level}: relative difference in area {difference:.2e}")
+            if difference > tolerance:
+                failed.append(f"{r}_restriction {level}")
+        n_invalid = db.query(
+            f"SELECT count(*) FROM designatedlands.{r}_restriction WHERE NOT ST_IsValid(geom)"
+        ).fetchone()[0]
+        results["restrictions_fixed"][f"{r}_invalid"] = n_invalid
+        if n_invalid:
+            LOG.warning(f"{r}_restriction: {n_invalid} invalid geometries")
+
+    report = {"parameters": parameters, "stages": results, "areas": comparison}
+    with open(out_file, "w") as f:
+        json.dump(report, f, indent=2)
+    LOG.info(f"Results written to {out_file}")
+    if failed:
+        raise click.ClickException(
+            "Area differs from default overlay by more than tolerance: " + ", ".join(failed)
+        )
+
+
+if __name__ == "__main__":
+    cli()
@@ -25,11 +25,14 @@ src_clip AS
    ST_UNion(geom) as geom
  FROM $in_table
  WHERE map_tile LIKE %s
+ -- (matching the partition key, so only the map sheet's partition is scanned)
+ AND left(map_tile, 4) = left(%s, 4)
  $query
  GROUP BY $columns, map_tile),
 
 dest_clip AS
-(SELECT * FROM $out_table WHERE map_tile LIKE %s),
+(SELECT * FROM $out_table
+ WHERE map_tile LIKE %s AND left(map_tile, 4) = left(%s, 4)),
 
 all_intersects AS
 (SELECT
@@ -119,7 +122,8 @@ SELECT
   ST_Safe_Repair(
     ST_Snap(
       (ST_Dump(
-        ST_Safe_Repair(ni.geom)
+        -- (repair of the input is skipped when it is known to be valid)
+        $repair(ni.geom)
         )).geom,
       t.geom, .01)
   ) as geom
@@ -25,10 +25,13 @@ src_clip AS
    geom
  FROM $in_table
  WHERE map_tile LIKE %s
+ -- (matching the partition key, so only the map sheet's partition is scanned)
+ AND left(map_tile, 4) = left(%s, 4)
  $query),
 
 dest_clip AS
-(SELECT * FROM $out_table WHERE map_tile LIKE %s),
+(SELECT * FROM $out_table
+ WHERE map_tile LIKE %s AND left(map_tile, 4) = left(%s, 4)),
 
 all_intersects AS
 (SELECT
@@ -118,7 +121,8 @@ SELECT
   ST_Safe_Repair(
     ST_Snap(
       (ST_Dump(
-        ST_Safe_Repair(ni.geom)
+        -- (repair of the input is skipped when it is known to be valid)
+        $repair(ni.geom)
         )).geom,
       t.geom, .01)
   ) as geom
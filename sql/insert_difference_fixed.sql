@@ -0,0 +1,74 @@
+-- Copyright 2017 Province of British Columbia
+--
+-- Licensed under the Apache License, Version 2.0 (the "License");
+-- you may not use this file except in compliance with the License.
+-- You may obtain a copy of the License at
+--
+-- http://www.apache.org/licenses/LICENSE-2.0
+--
+-- Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an "AS IS" BASIS,
+-- WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+--
+-- See the License for the specific language governing permissions and limitations under the License.
+
+
+-- ----------------------------------------------------------------------------------------------------
+
+--   Insert the difference of records in in_table and records already in
+--   out_table, for given tile.
+--   Fixed precision version of insert_difference.sql, requires PostGIS 3.1 / GEOS 3.9
+--   All geometries are computed on a grid of size $grid_size, overlay results
+--   are valid by construction so no snapping/buffering/repair is required
+
+INSERT INTO $out_table ($columns, map_tile, geom)
+
+WITH
+
+src_clip AS
+(SELECT
+   $source_pk as id,
+   $columns,
+   map_tile,
+   ST_ReducePrecision(geom, $grid_size) as geom
+ FROM $in_table
+ WHERE map_tile LIKE %s
+ -- (matching the partition key, so only the map sheet's partition is scanned)
+ AND left(map_tile, 4) = left(%s, 4)
+ $query),
+
+dest_clip AS
+(SELECT * FROM $out_table
+ WHERE map_tile LIKE %s AND left(map_tile, 4) = left(%s, 4)),
+
+-- Union the existing intersecting polys in the output/target layer
+target_intersections AS
+(SELECT
+   i.id,
+   ST_Union(o.geom, $grid_size) AS geom
+FROM src_clip AS i
+INNER JOIN dest_clip AS o
+ON ST_Intersects(o.geom, i.geom)
+GROUP BY i.id),
+
+difference AS
+(SELECT
+   $columns,
+   map_tile,
+   t.id IS NOT NULL AS differenced,
+   (ST_Dump(
+      ST_CollectionExtract(
+        CASE
+          WHEN t.id IS NULL THEN i.geom
+          ELSE ST_Difference(i.geom, t.geom, $grid_size)
+        END, 3)
+   )).geom AS geom
+FROM src_clip i
+LEFT JOIN target_intersections t ON i.id = t.id)
+
+SELECT
+  $columns,
+  map_tile,
+  geom
+FROM difference
+-- discard very small differences
+WHERE NOT differenced OR ST_Area(geom) > 10
@@ -29,12 +29,9 @@ tile_a AS
 (
   SELECT $columns_a,
     CASE
-      WHEN ST_CoveredBy(ST_CollectionExtract(a.geom, 3), ST_CollectionExtract(tile.geom, 3)) THEN ST_MakeValid(a.geom)
+      WHEN ST_CoveredBy(ST_CollectionExtract(a.geom, 3), ST_CollectionExtract(tile.geom, 3)) THEN $valid_a
       ELSE ST_CollectionExtract(
-               ST_Intersection(
-                    ST_MakeValid(
-                        ST_SnapToGrid(
-                             ST_Buffer(a.geom, 0), 0.001)), tile.geom),  3)
+               ST_Intersection($clean_a, tile.geom),  3)
     END as geom
   FROM $table_a a
   INNER JOIN tile ON ST_Intersects(ST_CollectionExtract(a.geom, 3), ST_CollectionExtract(tile.geom, 3))
@@ -44,12 +41,9 @@ tile_b AS
 (
   SELECT $columns_b,
     CASE
-      WHEN ST_CoveredBy(ST_CollectionExtract(b.geom, 3), ST_CollectionExtract(tile.geom, 3)) THEN ST_MakeValid(b.geom)
+      WHEN ST_CoveredBy(ST_CollectionExtract(b.geom, 3), ST_CollectionExtract(tile.geom, 3)) THEN $valid_b
       ELSE ST_CollectionExtract(
-               ST_Intersection(
-                    ST_MakeValid(
-                        ST_SnapToGrid(
-                             ST_Buffer(b.geom, 0), 0.001)), tile.geom),  3)
+               ST_Intersection($clean_b, tile.geom),  3)
     END as geom
   FROM $table_b b
   INNER JOIN tile ON ST_Intersects(ST_CollectionExtract(b.geom, 3), ST_CollectionExtract(tile.geom, 3))
@@ -59,15 +53,8 @@ SELECT
   $columns_a,
   $columns_b,
   CASE
-    WHEN ST_CoveredBy(a.geom, ST_Buffer(b.geom, .01)) THEN ST_MakeValid(a.geom)
-    ELSE ST_MakeValid(
-            ST_CollectionExtract(
-               ST_Intersection(
-                  ST_MakeValid(a.geom), ST_MakeValid(
-                                            ST_SnapToGrid(b.geom, 0.001))
-                               )
-               , 3)
-            )
+    WHEN ST_CoveredBy(a.geom, ST_Buffer(b.geom, .01)) THEN $valid_a
+    ELSE $intersection
   END as geom
 FROM tile_a a
 INNER JOIN tile_b b ON ST_Intersects(ST_CollectionExtract(a.geom, 3), ST_CollectionExtract(b.geom, 3));
@@ -41,7 +41,8 @@ SELECT
   $mine_restriction as mine_restriction,
   b.map_tile,
   -- make sure the output is valid
-  ST_Safe_Repair(
+  -- (repair is skipped when the source is known to be valid)
+  $repair(
   -- dump
     (ST_Dump(
   -- merge records with the same name and id
@@ -17,7 +17,7 @@
 --   Note that the only attribute retained is 'designation'
 
 -- create empty table with new auto-indexed id column
-CREATE TABLE IF NOT EXISTS $out_table (
+CREATE $unlogged TABLE IF NOT EXISTS $out_table (
      id serial PRIMARY KEY,
      designation text,
      map_tile text,
@@ -31,7 +31,8 @@ INSERT INTO $out_table (designation, map_tile, geom)
           '$designation'::TEXT AS designation,
           b.map_tile,
           -- make sure the output is valid
-          ST_Safe_Repair(
+          -- (repair is skipped when the source is known to be valid)
+          $repair(
           -- dump
             (ST_Dump(
           -- union to remove overlapping polys within the source